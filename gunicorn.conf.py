@@ -0,0 +1,26 @@
+# Gunicorn picks this file up automatically from the working directory.
+import os
+
+# Import Django (and run the shared warm-up in mysite/wsgi.py) once in the
+# master so workers inherit compiled templates and URL tables copy-on-write.
+preload_app = os.environ.get("GUNICORN_PRELOAD", "True") != "False"
+
+
+def post_worker_init(worker):
+    """Open this worker's DB connection and prime the catalog before serving."""
+    from django.conf import settings
+
+    if settings.WARMUP_ON_STARTUP:
+        from hello.warmup import WORKER_STEPS, warm_up
+
+        warm_up(WORKER_STEPS)
+
+
+def worker_exit(server, worker):
+    """Flush spooled enquiries before the worker (or the whole dyno) goes away."""
+    from django.conf import settings
+
+    if settings.configured:
+        from hello.enquiries import flush
+
+        flush()
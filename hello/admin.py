@@ -1,5 +1,12 @@
-from django.contrib import admin
-from .models import Destination, Package, Booking, Review
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib import admin, messages
+from django.http import FileResponse, Http404
+from django.urls import path, reverse
+from django.utils.html import format_html
+
+from .models import Destination, Package, Booking, ArchivedBooking, Review, Enquiry, RequestProfile
 
 
 @admin.register(Destination)
@@ -42,6 +49,7 @@ class BookingAdmin(admin.ModelAdmin):
     ordering = ("-booking_date",)
     list_editable = ("status",)
     date_hierarchy = "travel_date"
+    actions = ("mark_confirmed", "mark_completed", "mark_cancelled")
 
     fieldsets = (
         ("Booking Details", {
@@ -53,6 +61,57 @@ class BookingAdmin(admin.ModelAdmin):
         }),
     )
 
+    # Statuses each bulk action may move a booking from.
+    STATUS_SOURCES = {
+        "CONFIRMED": ("PENDING",),
+        "COMPLETED": ("CONFIRMED",),
+        "CANCELLED": ("PENDING", "CONFIRMED"),
+    }
+
+    def _set_status(self, request, queryset, status):
+        # One UPDATE for the whole selection instead of save() per row.
+        sources = self.STATUS_SOURCES[status]
+        selected = queryset.count()
+        updated = queryset.filter(status__in=sources).update(status=status)
+        self.message_user(request, f"{updated} booking(s) marked {status.lower()}.")
+        skipped = selected - updated
+        if skipped:
+            allowed = " or ".join(s.lower() for s in sources)
+            self.message_user(
+                request,
+                f"{skipped} booking(s) skipped: only {allowed} bookings can be marked {status.lower()}.",
+                messages.WARNING,
+            )
+
+    @admin.action(description="Mark selected bookings as confirmed")
+    def mark_confirmed(self, request, queryset):
+        self._set_status(request, queryset, "CONFIRMED")
+
+    @admin.action(description="Mark selected bookings as completed")
+    def mark_completed(self, request, queryset):
+        self._set_status(request, queryset, "COMPLETED")
+
+    @admin.action(description="Mark selected bookings as cancelled")
+    def mark_cancelled(self, request, queryset):
+        self._set_status(request, queryset, "CANCELLED")
+
+
+@admin.register(ArchivedBooking)
+class ArchivedBookingAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "package", "travel_date", "number_of_people", "total_price", "status", "archived_at")
+    list_filter = ("status", "travel_date")
+    search_fields = ("=id", "user__username", "user__email", "package__title")
+    list_select_related = ("user", "package")
+    ordering = ("-travel_date",)
+    date_hierarchy = "travel_date"
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
 
 @admin.register(Review)
 class ReviewAdmin(admin.ModelAdmin):
@@ -62,3 +121,56 @@ class ReviewAdmin(admin.ModelAdmin):
     autocomplete_fields = ("user", "package")
     ordering = ("-created_at",)
     date_hierarchy = "created_at"
+
+
+@admin.register(Enquiry)
+class EnquiryAdmin(admin.ModelAdmin):
+    list_display = ("name", "email", "phone", "package", "check_in", "check_out", "adults", "created_at")
+    list_filter = ("trip_type", "visa", "created_at")
+    search_fields = ("name", "email", "phone", "package", "destination")
+    readonly_fields = ("ref", "created_at")
+    ordering = ("-created_at",)
+    date_hierarchy = "created_at"
+
+    def has_add_permission(self, request):
+        # Enquiries only arrive through the form and the spool, which assign ref and created_at.
+        return False
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = ("path", "method", "status_code", "duration_ms", "sql_ms", "sql_count", "user", "created_at", "download")
+    list_filter = ("method", "status_code", "created_at")
+    search_fields = ("path",)
+    ordering = ("-duration_ms",)
+    list_select_related = ("user",)
+    date_hierarchy = "created_at"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description="Profile")
+    def download(self, obj):
+        url = reverse("admin:hello_requestprofile_download", args=[obj.pk])
+        return format_html('<a href="{}">{}</a>', url, obj.filename)
+
+    def get_urls(self):
+        return [
+            path(
+                "<int:pk>/download/",
+                self.admin_site.admin_view(self.download_view),
+                name="hello_requestprofile_download",
+            ),
+        ] + super().get_urls()
+
+    def download_view(self, request, pk):
+        obj = self.get_object(request, pk)
+        if obj is None or not self.has_view_permission(request, obj):
+            raise Http404
+        file = Path(settings.PROFILER["DIR"]) / obj.filename
+        if not file.is_file():
+            raise Http404("Profile file no longer exists.")
+        return FileResponse(file.open("rb"), as_attachment=True, filename=obj.filename)
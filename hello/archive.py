@@ -0,0 +1,34 @@
+"""
+Moves finished bookings past the retention horizon into ArchivedBooking.
+
+Work is done in small transactions so a run can be interrupted and simply
+re-run: each chunk is copied and deleted atomically, so a booking is never in
+both tables. A conflicting insert therefore means something else wrote the
+archive row; it raises and rolls the chunk back rather than deleting a
+booking whose copy was not written.
+"""
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ArchivedBooking, Booking
+
+
+def archivable(retention_days=None):
+    cfg = settings.BOOKING_ARCHIVE
+    days = cfg["RETENTION_DAYS"] if retention_days is None else retention_days
+    horizon = timezone.localdate() - datetime.timedelta(days=days)
+    return Booking.objects.filter(status__in=cfg["STATUSES"], travel_date__lt=horizon)
+
+
+def archive_chunk(queryset, batch_size):
+    """Archive up to ``batch_size`` bookings from ``queryset``; returns the number moved."""
+    with transaction.atomic():
+        rows = list(queryset.order_by("pk").select_for_update()[:batch_size])
+        if not rows:
+            return 0
+        ArchivedBooking.objects.bulk_create([ArchivedBooking.from_booking(b) for b in rows])
+        Booking.objects.filter(pk__in=[b.pk for b in rows]).delete()
+    return len(rows)
@@ -0,0 +1,250 @@
+"""
+CSS bundles built at collectstatic time (see hello/storage.py).
+
+Each page bundle concatenates its stylesheets and drops repeated rules. Rules
+that every page carries verbatim are hoisted into one ``common`` bundle that
+is downloaded once and cached across pages. For each page, the rules styling
+the above-the-fold chrome are also written to a small ``critical`` file that
+the {% css_bundle %} tag inlines. Bundles live next to their sources so
+relative url() references keep resolving.
+"""
+import re
+
+CSS_BUNDLES = {
+    "about": ["hello/main.css", "hello/about.css"],
+    "booking_form": ["hello/main.css", "hello/packages.css", "hello/booking_form.css"],
+    "booking_thanks": ["hello/booking_thanks.css"],
+    "contact": ["hello/contact.css"],
+    "cookies": ["hello/main.css", "hello/cookies.css"],
+    "dashboard": ["hello/dashboard.css"],
+    "enquiry": ["hello/enquiry.css"],
+    "help": ["hello/help.css"],
+    "index": ["hello/main.css", "hello/index.css"],
+    "login": ["hello/main.css", "hello/login.css"],
+    "package_detail": ["hello/package_detail.css"],
+    "packages": ["hello/main.css", "hello/packages.css", "hello/package_list.css"],
+    "privacy": ["hello/privacy.css"],
+    "signup": ["hello/main.css", "hello/signup.css"],
+    "terms": ["hello/terms.css"],
+}
+COMMON_BUNDLE = "common"
+
+# Rules whose selectors start with one of these are inlined as critical CSS:
+# the header, page hero and base typography every page paints first.
+ABOVE_THE_FOLD = {
+    ":root", "*", "html", "body",
+    ".topbar", ".container", ".nav", ".logo", ".menu", ".actions", ".hamburger",
+    ".mobile-menu", ".hero", ".hero-slider", ".slides", ".slide", ".veil",
+    ".caption", ".cap", ".page-head", ".h1", ".lead",
+}
+
+_COMMENT_RE = re.compile(r"/\*.*?\*/", re.S)
+_SPACE_RE = re.compile(r"\s+")
+_PUNCT_RE = re.compile(r"\s*([{};,>])\s*")
+_PSEUDO_RE = re.compile(r"::?[\w-]+(\([^)]*\))?")
+_TOKEN_RE = re.compile(r"[.#]?[\w-]+|\*|:root")
+_COMBINATOR_RE = re.compile(r"\s*[\s>+~]\s*")
+
+
+def bundle_name(bundle):
+    return f"hello/bundle-{bundle}.css"
+
+
+def critical_name(bundle):
+    return f"hello/bundle-{bundle}.critical.css"
+
+
+def _minify(rule):
+    rule = _SPACE_RE.sub(" ", rule).strip()
+    return _PUNCT_RE.sub(r"\1", rule).replace(";}", "}")
+
+
+def split_rules(css):
+    """Split a stylesheet into top-level rules (an @media block counts as one)."""
+    css = _COMMENT_RE.sub("", css)
+    rules, depth, start = [], 0, 0
+    for i, ch in enumerate(css):
+        if ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                rules.append(_minify(css[start:i + 1]))
+                start = i + 1
+        elif ch == ";" and depth == 0:  # @charset / @import
+            rules.append(_minify(css[start:i + 1]))
+            start = i + 1
+    return [r for r in rules if r]
+
+
+def dedupe(rules):
+    """
+    Drop repeated rules, keeping the last copy. A later identical rule
+    overrides everything the earlier one could, so the cascade is unchanged.
+    """
+    last = {rule: i for i, rule in enumerate(rules)}
+    return [rule for i, rule in enumerate(rules) if last[rule] == i]
+
+
+def build_css(sources):
+    """Concatenate stylesheets into one deduplicated, minified stylesheet."""
+    return _join(dedupe([rule for css in sources for rule in split_rules(css)]))
+
+
+def _join(rules):
+    return "\n".join(rules) + "\n" if rules else ""
+
+
+# ---------- Rule introspection ----------
+def _style_rules(rule):
+    """Yield (selectors, properties) for a rule, looking inside @media blocks."""
+    if rule.startswith("@"):
+        if "{" in rule:
+            inner = rule[rule.index("{") + 1:-1]
+            for nested in split_rules(inner):
+                yield from _style_rules(nested)
+        return
+    if "{" not in rule:
+        return
+    selectors, body = rule[:-1].split("{", 1)
+    props = {decl.split(":", 1)[0].strip().lower() for decl in body.split(";") if ":" in decl}
+    yield [s.strip() for s in selectors.split(",")], props
+
+
+def _compounds(selector):
+    return [c for c in _COMBINATOR_RE.split(_PSEUDO_RE.sub("", selector).strip()) if c]
+
+
+def _tokens(compound):
+    return set(_TOKEN_RE.findall(compound)) or {"*"}
+
+
+def _specificity(selector):
+    """(ids, classes/attributes/pseudo-classes, types/pseudo-elements)."""
+    pseudo_elements = len(re.findall(r"::[\w-]+", selector))
+    pseudo_classes = len(re.findall(r"(?<!:):(?!:)[\w-]+", selector))
+    plain = _PSEUDO_RE.sub("", selector)
+    types = len(re.findall(r"(?:^|(?<=[\s>+~]))[a-zA-Z][\w-]*", plain))
+    return plain.count("#"), plain.count(".") + plain.count("[") + pseudo_classes, types + pseudo_elements
+
+
+def _subjects(selector):
+    """Simple selectors of the element a selector styles (its last compound)."""
+    compounds = _compounds(selector)
+    return _tokens(compounds[-1]) if compounds else {"*"}
+
+
+def _pseudo_element(selector):
+    match = re.search(r"::?(before|after|first-line|first-letter|placeholder|marker|selection)\b", selector)
+    return match.group(1) if match else None
+
+
+def _may_overlap(a, b):
+    """
+    Whether two selectors might style the same box. Different pseudo-elements
+    never do. Subjects named by
+    different tags, classes or ids are assumed independent, which holds for
+    this site's stylesheets; other type-only and universal subjects overlap.
+    """
+    if _pseudo_element(a) != _pseudo_element(b):
+        return False
+    subj_a, subj_b = _subjects(a), _subjects(b)
+    tags_a = {t for t in subj_a if t[0].isalpha()}
+    tags_b = {t for t in subj_b if t[0].isalpha()}
+    if tags_a and tags_b and not tags_a & tags_b:
+        return False
+    named_a = {t for t in subj_a if t[0] in ".#"}
+    named_b = {t for t in subj_b if t[0] in ".#"}
+    if not named_a or not named_b:
+        return True
+    return bool(named_a & named_b)
+
+
+def conflicts(a, b):
+    """
+    Whether swapping two rules could change the cascade: they share a
+    property, have equal specificity (otherwise the more specific one wins
+    regardless of order) and may style the same element.
+    """
+    for sels_a, props_a in _style_rules(a):
+        for sels_b, props_b in _style_rules(b):
+            if not props_a & props_b:
+                continue
+            for sa in sels_a:
+                for sb in sels_b:
+                    if _specificity(sa) == _specificity(sb) and _may_overlap(sa, sb):
+                        return True
+    return False
+
+
+def is_critical(rule):
+    for selectors, _ in _style_rules(rule):
+        for selector in selectors:
+            # Read the first compound before pseudo-classes are stripped, or
+            # ":root" (where the custom properties live) would vanish.
+            first = _COMBINATOR_RE.split(selector.strip(), maxsplit=1)[0]
+            if set(_TOKEN_RE.findall(first)) & ABOVE_THE_FOLD:
+                return True
+    return False
+
+
+# ---------- Bundling ----------
+def common_rules(pages):
+    """
+    Rules present in every page that can be loaded ahead of each page's own
+    rules without changing its cascade. ``pages`` maps name -> rule list.
+
+    A rule is dropped if, in any page, an earlier page-only rule might
+    conflict with it (hoisting would let that rule win), or if two common rules
+    that conflict appear in different orders on different pages.
+    """
+    if not pages:
+        return []
+    lists = list(pages.values())
+    common = set.intersection(*(set(rules) for rules in lists))
+    changed = True
+    while changed:
+        changed = False
+        order = [r for r in lists[0] if r in common]
+        position = {r: i for i, r in enumerate(order)}
+        for rules in lists:
+            seen_local = []
+            seen_common = []
+            for rule in rules:
+                if rule not in common:
+                    seen_local.append(rule)
+                    continue
+                unsafe = any(conflicts(prev, rule) for prev in seen_local) or any(
+                    position[prev] > position[rule] and conflicts(prev, rule) for prev in seen_common
+                )
+                if unsafe:
+                    common.discard(rule)
+                    changed = True
+                    break
+                seen_common.append(rule)
+            if changed:
+                break
+    return [r for r in lists[0] if r in common]
+
+
+def build_bundles(read):
+    """
+    Build every bundle. ``read(path)`` returns a source stylesheet's text.
+    Returns {static name: css} for the common bundle, each page bundle and
+    each page's critical subset.
+    """
+    pages = {
+        bundle: dedupe([rule for path in sources for rule in split_rules(read(path))])
+        for bundle, sources in CSS_BUNDLES.items()
+    }
+    common = common_rules(pages)
+    shared = set(common)
+
+    output = {bundle_name(COMMON_BUNDLE): _join(common)}
+    for bundle, rules in pages.items():
+        output[bundle_name(bundle)] = _join([r for r in rules if r not in shared])
+        # Critical rules in the order the page applies them: common first.
+        critical = [r for r in common if is_critical(r)]
+        critical += [r for r in rules if r not in shared and is_critical(r)]
+        output[critical_name(bundle)] = _join(critical)
+    return output
@@ -0,0 +1,243 @@
+"""
+Two-tier read-through cache for Package lookups by slug.
+
+Tier 1 is a small per-process LRU with a short TTL; tier 2 is Django's shared
+cache. The cache only runs when PACKAGE_CACHE["ENABLED"] is set, which needs a
+cross-process backend (see hello/checks.py); otherwise lookups go straight to
+the database. Every key embeds a global version stamp that is bumped whenever a
+Package or Destination is saved or deleted (see hello/signals.py), so all
+workers drop stale entries together. Cached packages carry their destination
+and must be treated as read-only.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Package
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "pkgcache:version"
+STATS_KEY = "pkgcache:stats:{}"
+STAT_NAMES = ("local_hits", "shared_hits", "misses")
+_MISSING = "__missing__"  # negative-cache marker for unknown slugs
+
+
+class LocalLRU:
+    """Thread-safe LRU with per-entry expiry."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_local = LocalLRU(settings.PACKAGE_CACHE["LOCAL_MAXSIZE"], settings.PACKAGE_CACHE["LOCAL_TTL"])
+_version = {"value": None, "checked": 0.0}
+_fill_locks = {}  # key -> [lock, threads holding or waiting on it]
+_fill_locks_guard = threading.Lock()
+_stats = dict.fromkeys(STAT_NAMES, 0)
+_stats_lock = threading.Lock()
+
+
+# ---------- Versioning ----------
+def current_version():
+    """Global version stamp, re-read from the shared tier at most once per VERSION_CHECK."""
+    now = time.monotonic()
+    if _version["value"] is None or now - _version["checked"] > settings.PACKAGE_CACHE["VERSION_CHECK"]:
+        version = cache.get(VERSION_KEY)
+        if version is None:
+            cache.add(VERSION_KEY, 1, timeout=None)
+            version = cache.get(VERSION_KEY, 1)
+        _version.update(value=version, checked=now)
+    return _version["value"]
+
+
+def bump_version():
+    """Invalidate every cached package in every worker."""
+    if not settings.PACKAGE_CACHE["ENABLED"]:
+        return
+    _local.clear()
+    try:
+        try:
+            version = cache.incr(VERSION_KEY)
+        except ValueError:  # key missing or evicted
+            cache.add(VERSION_KEY, 1, timeout=None)
+            version = cache.incr(VERSION_KEY)
+    except Exception:
+        # Runs after commit; failing here must not turn the save into a 500.
+        logger.exception("Could not bump package cache version")
+        return
+    _version.update(value=version, checked=time.monotonic())
+
+
+def _key(slug, version):
+    return f"pkgcache:v{version}:{slug}"
+
+
+# ---------- Stats ----------
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+        pending = sum(_stats.values())
+        if pending < settings.PACKAGE_CACHE["STATS_FLUSH_EVERY"]:
+            return
+        flushed = dict(_stats)
+        for stat in _stats:
+            _stats[stat] = 0
+    try:
+        for stat, n in flushed.items():
+            if n:
+                key = STATS_KEY.format(stat)
+                cache.add(key, 0, timeout=None)
+                cache.incr(key, n)
+    except Exception as exc:
+        logger.warning("Could not flush package cache stats: %s", exc)
+
+
+def stats():
+    """Hit counters aggregated across workers (plus this process's unflushed ones)."""
+    shared = cache.get_many([STATS_KEY.format(s) for s in STAT_NAMES])
+    with _stats_lock:
+        counts = {s: shared.get(STATS_KEY.format(s), 0) + _stats[s] for s in STAT_NAMES}
+    total = sum(counts.values())
+    counts["lookups"] = total
+    counts["local_ratio"] = counts["local_hits"] / total if total else 0.0
+    counts["hit_ratio"] = (counts["local_hits"] + counts["shared_hits"]) / total if total else 0.0
+    return counts
+
+
+# ---------- Lookups ----------
+@contextmanager
+def _fill_lock(key):
+    """Per-key lock for this worker; dropped once no thread holds or awaits it."""
+    with _fill_locks_guard:
+        entry = _fill_locks.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _fill_locks_guard:
+            entry[1] -= 1
+            if not entry[1]:
+                del _fill_locks[key]
+
+
+def _fetch(slug):
+    return Package.objects.select_related("destination").filter(slug=slug).first()
+
+
+def _load(slug):
+    package = _fetch(slug)
+    return _MISSING if package is None else package
+
+
+def get_package(slug):
+    """
+    Return the Package for ``slug`` (destination pre-joined) or None.
+
+    Shared-tier misses are filled by one caller at a time: threads in this
+    worker queue on a local lock, and other workers back off while a
+    short-lived ``cache.add`` lock is held, so editing a hot package does not
+    send every in-flight request to the database at once. If the shared
+    cache is unreachable the package is read from the database.
+    """
+    cfg = settings.PACKAGE_CACHE
+    if not cfg["ENABLED"]:
+        return _fetch(slug)
+    try:
+        key = _key(slug, current_version())
+    except Exception as exc:
+        logger.warning("Package cache unavailable, reading from the database: %s", exc)
+        return _fetch(slug)
+
+    value = _local.get(key)
+    if value is not None:
+        _count("local_hits")
+        return None if value == _MISSING else value
+
+    with _fill_lock(key):
+        value = _local.get(key)  # filled by another thread while we waited
+        if value is not None:
+            _count("local_hits")
+        else:
+            try:
+                value = cache.get(key)
+                if value is None:
+                    value = _fill_shared(key, slug, cfg)
+                else:
+                    _count("shared_hits")
+            except Exception as exc:
+                # Not cached locally either: without the shared tier we
+                # cannot see version bumps from other workers.
+                logger.warning("Package cache unavailable, reading from the database: %s", exc)
+                value = _load(slug)
+            else:
+                _local.set(key, value)
+    return None if value == _MISSING else value
+
+
+def _fill_shared(key, slug, cfg):
+    lock_key = f"{key}:lock"
+    locked = cache.add(lock_key, 1, timeout=cfg["FILL_LOCK_TIMEOUT"])
+    if not locked:
+        deadline = time.monotonic() + cfg["FILL_WAIT"]
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            value = cache.get(key)
+            if value is not None:
+                _count("shared_hits")
+                return value
+    try:
+        _count("misses")
+        value = _load(slug)
+        ttl = cfg["SHARED_TTL"] if value != _MISSING else cfg["NEGATIVE_TTL"]
+        cache.set(key, value, timeout=ttl)
+        return value
+    finally:
+        # Only the holder releases the lock; a caller that gave up waiting
+        # must not free another worker's lock.
+        if locked:
+            cache.delete(lock_key)
+
+
+def prime(packages):
+    """Seed both tiers with already-loaded packages (used by warm-up); returns how many were cached."""
+    if not settings.PACKAGE_CACHE["ENABLED"]:
+        return 0
+    version = current_version()
+    entries = {_key(p.slug, version): p for p in packages}
+    cache.set_many(entries, timeout=settings.PACKAGE_CACHE["SHARED_TTL"])
+    for key, package in entries.items():
+        _local.set(key, package)
+    return len(entries)
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core import checks
+
+# Backends whose contents are private to one process; a version bump in one
+# gunicorn worker would never reach the others.
+PER_PROCESS_BACKENDS = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+
+@checks.register(checks.Tags.caches)
+def check_package_cache(app_configs, **kwargs):
+    if not settings.PACKAGE_CACHE["ENABLED"]:
+        return []
+    backend = settings.CACHES["default"]["BACKEND"]
+    if backend in PER_PROCESS_BACKENDS:
+        return [checks.Error(
+            f"PACKAGE_CACHE is enabled but the default cache ({backend}) is per-process, "
+            "so package edits would not invalidate other workers.",
+            hint="Set REDIS_URL (or another shared cache backend) or disable PACKAGE_CACHE['ENABLED'].",
+            id="hello.E001",
+        )]
+    return []
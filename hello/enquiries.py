@@ -0,0 +1,199 @@
+"""
+Buffered ingestion for enquiry form submissions.
+
+The view appends each accepted enquiry as one JSON line to a per-process spool
+file instead of opening a database transaction. The web process that wrote the
+spool also drains it: a timer flushes it into the Enquiry table with
+bulk_create FLUSH_INTERVAL seconds after the first unflushed enquiry, or at
+once when the file reaches FLUSH_BYTES, and gunicorn flushes again as a worker
+exits (see gunicorn.conf.py). No separate process has to share the spool's
+disk. ``manage.py drain_enquiries`` runs the same drain by hand. An exclusive
+lock file means only one drainer runs at a time, and each record carries a
+unique ``ref`` so re-draining a file after a crash cannot insert duplicates.
+"""
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Enquiry
+
+logger = logging.getLogger(__name__)
+
+SPOOL_SUFFIX = ".jsonl"
+DRAINING_SUFFIX = ".draining"
+DRAIN_LOCK = ".drain.lock"
+
+_flush = {"timer": None}
+_flush_lock = threading.Lock()
+
+
+def spool_dir():
+    return Path(settings.ENQUIRY["SPOOL_DIR"])
+
+
+# ---------- Dedupe ----------
+def _normalize_phone(phone):
+    digits = re.sub(r"\D", "", phone or "")
+    return digits[-10:]
+
+
+def _dedupe_key(email, phone, package):
+    ident = "|".join([(email or "").strip().lower(), _normalize_phone(phone), (package or "").strip().lower()])
+    return "enquiry:seen:" + hashlib.sha1(ident.encode("utf-8")).hexdigest()
+
+
+def claim(email, phone, package):
+    """
+    Reserve the (email, phone, package) triple for ENQUIRY["DEDUPE_WINDOW"]
+    seconds. Returns False if the same enquiry was already accepted in the window.
+    """
+    return cache.add(_dedupe_key(email, phone, package), 1, timeout=settings.ENQUIRY["DEDUPE_WINDOW"])
+
+
+def release(email, phone, package):
+    """Undo claim() when the enquiry could not be spooled, so a retry is accepted."""
+    cache.delete(_dedupe_key(email, phone, package))
+
+
+# ---------- Spool ----------
+def append(data):
+    """Append one enquiry to this process's spool file."""
+    record = dict(data, ref=uuid.uuid4().hex, created_at=timezone.now())
+    line = json.dumps(record, cls=DjangoJSONEncoder) + "\n"
+    directory = spool_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"enquiries-{os.getpid()}{SPOOL_SUFFIX}"
+
+    while True:
+        with open(path, "a", encoding="utf-8") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            # The drainer may have renamed the file between our open and lock;
+            # if so, reopen so the record lands in the live spool file.
+            try:
+                if os.stat(path).st_ino != os.fstat(fh.fileno()).st_ino:
+                    continue
+            except FileNotFoundError:
+                continue
+            fh.write(line)
+            fh.flush()
+            size = fh.tell()
+        break
+    schedule_flush(now=size >= settings.ENQUIRY["FLUSH_BYTES"])
+    return record["ref"]
+
+
+def _read(path):
+    records = []
+    with open(path, "r", encoding="utf-8") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)  # wait out any writer that opened before the rename
+        for lineno, line in enumerate(fh, 1):
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                logger.warning("Skipping malformed enquiry at %s:%d", path.name, lineno)
+    return records
+
+
+def drain(batch_size=None):
+    """
+    Move every spooled enquiry into the database.
+    Returns (enquiries written, files drained); records already present from
+    an interrupted earlier drain are skipped by the unique ``ref`` but counted.
+    Only one drainer runs at a time; a concurrent call returns (0, 0).
+    """
+    batch_size = batch_size or settings.ENQUIRY["BATCH_SIZE"]
+    directory = spool_dir()
+    if not directory.is_dir():
+        return 0, 0
+
+    with open(directory / DRAIN_LOCK, "a") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            logger.info("Another enquiry drain is running; skipping")
+            return 0, 0
+        return _drain_locked(directory, batch_size)
+
+
+def _drain_locked(directory, batch_size):
+    stamp = time.strftime("%Y%m%d%H%M%S")
+    for live in directory.glob(f"*{SPOOL_SUFFIX}"):
+        live.rename(live.with_name(f"{live.name}.{stamp}{DRAINING_SUFFIX}"))
+
+    inserted = files = 0
+    fields = {f.name for f in Enquiry._meta.concrete_fields} - {"id"}
+    for path in sorted(directory.glob(f"*{DRAINING_SUFFIX}")):
+        rows = [Enquiry(**{k: v for k, v in r.items() if k in fields}) for r in _read(path)]
+        with transaction.atomic():
+            for start in range(0, len(rows), batch_size):
+                created = Enquiry.objects.bulk_create(
+                    rows[start:start + batch_size], ignore_conflicts=True
+                )
+                inserted += len(created)
+        path.unlink()
+        files += 1
+    return inserted, files
+
+
+# ---------- Flushing ----------
+def schedule_flush(now=False):
+    """
+    Make sure a flush is pending: FLUSH_INTERVAL seconds from the first
+    unflushed enquiry, or straight away with ``now``. With FLUSH_INTERVAL 0
+    the caller drains inline.
+    """
+    interval = settings.ENQUIRY["FLUSH_INTERVAL"]
+    if interval <= 0:
+        flush()
+        return
+    with _flush_lock:
+        pending = _flush["timer"]
+        if pending is not None:
+            if not now:
+                return
+            pending.cancel()
+        timer = _flush["timer"] = threading.Timer(0 if now else interval, _flush_in_background)
+        timer.daemon = True
+    timer.start()
+
+
+def flush():
+    """
+    Drain the spool now. Anything left behind (another drainer held the lock,
+    or the database was unavailable) is retried on a fresh timer.
+    """
+    with _flush_lock:
+        pending, _flush["timer"] = _flush["timer"], None
+    if pending is not None:
+        pending.cancel()
+    try:
+        inserted, _ = drain()
+        if inserted:
+            logger.info("Flushed %d enquiries", inserted)
+    except Exception:
+        logger.exception("Enquiry flush failed; retrying")
+    leftover = any(spool_dir().glob(f"*{SPOOL_SUFFIX}")) or any(spool_dir().glob(f"*{DRAINING_SUFFIX}"))
+    if leftover and settings.ENQUIRY["FLUSH_INTERVAL"] > 0:
+        schedule_flush()
+
+
+def _flush_in_background():
+    try:
+        flush()
+    finally:
+        connection.close()  # the timer thread's own connection
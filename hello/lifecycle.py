@@ -0,0 +1,65 @@
+"""
+Set-based booking status transitions, applied by ``manage.py sweep_bookings``.
+
+Each transition selects a chunk of primary keys through the status/travel_date
+indexes and flips them with one UPDATE that re-checks the source status, so a
+sweep is idempotent and safe to run alongside staff edits. Nothing denormalised
+depends on booking status (dashboard figures are computed per request), so a
+plain UPDATE without save() keeps every summary consistent.
+"""
+import datetime
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Booking
+
+
+@dataclass(frozen=True)
+class Transition:
+    name: str
+    from_status: str
+    to_status: str
+    condition: Callable[[], Q]
+
+
+def _past_trip():
+    return Q(travel_date__lt=timezone.localdate())
+
+
+def _stale_pending():
+    cutoff = timezone.now() - datetime.timedelta(hours=settings.BOOKING_LIFECYCLE["PENDING_TTL_HOURS"])
+    return Q(booking_date__lt=cutoff) | Q(travel_date__lt=timezone.localdate())
+
+
+TRANSITIONS = [
+    Transition("expire_pending", "PENDING", "CANCELLED", _stale_pending),
+    Transition("complete_trips", "CONFIRMED", "COMPLETED", _past_trip),
+]
+
+
+def pending(transition):
+    return Booking.objects.filter(transition.condition(), status=transition.from_status)
+
+
+def apply(transition, batch_size, max_batches=0):
+    """
+    Run ``transition`` in chunks until nothing matches (or ``max_batches``).
+    Returns (rows updated, seconds taken).
+    """
+    started = time.perf_counter()
+    qs = pending(transition)
+    updated = batches = 0
+    while not max_batches or batches < max_batches:
+        ids = list(qs.order_by("pk").values_list("pk", flat=True)[:batch_size])
+        if not ids:
+            break
+        updated += Booking.objects.filter(pk__in=ids, status=transition.from_status).update(
+            status=transition.to_status
+        )
+        batches += 1
+    return updated, time.perf_counter() - started
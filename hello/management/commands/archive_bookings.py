@@ -0,0 +1,40 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from hello.archive import archivable, archive_chunk
+
+
+class Command(BaseCommand):
+    help = "Move completed/cancelled bookings past the retention horizon into the archive table."
+
+    def add_arguments(self, parser):
+        cfg = settings.BOOKING_ARCHIVE
+        parser.add_argument("--days", type=int, default=cfg["RETENTION_DAYS"],
+                            help="Archive bookings whose travel date is older than this many days.")
+        parser.add_argument("--batch-size", type=int, default=cfg["BATCH_SIZE"])
+        parser.add_argument("--max-batches", type=int, default=0,
+                            help="Stop after this many batches (0 = until done). Re-run to resume.")
+        parser.add_argument("--dry-run", action="store_true", help="Only count eligible bookings.")
+
+    def handle(self, *args, **options):
+        qs = archivable(options["days"])
+        if options["dry_run"]:
+            self.stdout.write(f"{qs.count()} bookings eligible for archival.")
+            return
+
+        started = time.perf_counter()
+        moved = batches = 0
+        while not options["max_batches"] or batches < options["max_batches"]:
+            n = archive_chunk(qs, options["batch_size"])
+            if not n:
+                break
+            moved += n
+            batches += 1
+            self.stdout.write(f"batch {batches}: {n} archived ({moved} total)")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {moved} bookings in {batches} batches ({elapsed:.1f}s)."
+        ))
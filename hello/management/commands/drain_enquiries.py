@@ -0,0 +1,36 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from hello.enquiries import drain
+
+
+class Command(BaseCommand):
+    help = "Bulk-insert spooled enquiry submissions into the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=settings.ENQUIRY["BATCH_SIZE"])
+        parser.add_argument("--watch", type=float, default=0, metavar="SECONDS",
+                            help="Keep running, draining every SECONDS.")
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.perf_counter()
+            try:
+                inserted, files = drain(options["batch_size"])
+            except Exception as exc:
+                if not options["watch"]:
+                    raise
+                # Keep the worker alive; the spool is retried on the next pass.
+                self.stderr.write(f"Enquiry drain failed, retrying: {exc}")
+                close_old_connections()
+                time.sleep(options["watch"])
+                continue
+            if files or not options["watch"]:
+                elapsed = time.perf_counter() - started
+                self.stdout.write(f"Drained {inserted} enquiries from {files} spool file(s) in {elapsed:.2f}s.")
+            if not options["watch"]:
+                return
+            time.sleep(options["watch"])
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from hello.cache import current_version, stats
+
+
+class Command(BaseCommand):
+    help = "Show hit ratios of the package-by-slug cache across workers."
+
+    def handle(self, *args, **options):
+        counts = stats()
+        self.stdout.write(f"version       {current_version()}")
+        for name in ("lookups", "local_hits", "shared_hits", "misses"):
+            self.stdout.write(f"{name:<13} {counts[name]}")
+        self.stdout.write(f"local ratio   {counts['local_ratio']:.1%}")
+        self.stdout.write(f"hit ratio     {counts['hit_ratio']:.1%}")
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from hello.lifecycle import TRANSITIONS, apply, pending
+
+
+class Command(BaseCommand):
+    help = "Apply booking status transitions (expire stale PENDING, complete past trips) in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "transitions", nargs="*",
+            help=f"Transitions to run (default: all). Choices: {', '.join(t.name for t in TRANSITIONS)}.",
+        )
+        parser.add_argument("--batch-size", type=int, default=settings.BOOKING_LIFECYCLE["BATCH_SIZE"])
+        parser.add_argument("--max-batches", type=int, default=0,
+                            help="Stop each transition after this many batches (0 = until done).")
+        parser.add_argument("--dry-run", action="store_true", help="Only count matching bookings.")
+
+    def handle(self, *args, **options):
+        by_name = {t.name: t for t in TRANSITIONS}
+        unknown = set(options["transitions"]) - set(by_name)
+        if unknown:
+            raise CommandError(f"Unknown transition(s): {', '.join(sorted(unknown))}")
+
+        for transition in [by_name[n] for n in options["transitions"]] or TRANSITIONS:
+            label = f"{transition.name} ({transition.from_status} -> {transition.to_status})"
+            if options["dry_run"]:
+                self.stdout.write(f"{label}: {pending(transition).count()} bookings")
+                continue
+            updated, elapsed = apply(transition, options["batch_size"], options["max_batches"])
+            rate = updated / elapsed if elapsed else 0
+            self.stdout.write(f"{label}: {updated} updated in {elapsed:.2f}s ({rate:.0f} rows/s)")
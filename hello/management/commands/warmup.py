@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from hello.warmup import STEPS, warm_up
+
+
+class Command(BaseCommand):
+    help = "Run the worker warm-up steps and print a startup-time report."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "steps", nargs="*",
+            help=f"Steps to run (default: all). Choices: {', '.join(STEPS)}.",
+        )
+
+    def handle(self, *args, **options):
+        unknown = set(options["steps"]) - set(STEPS)
+        if unknown:
+            raise CommandError(f"Unknown warm-up step(s): {', '.join(sorted(unknown))}")
+
+        started = time.perf_counter()
+        report = warm_up(options["steps"] or None)
+        for name, ms, detail in report:
+            self.stdout.write(f"{name:<10} {ms:8.1f} ms  {detail}")
+        total = (time.perf_counter() - started) * 1000
+        self.stdout.write(self.style.SUCCESS(f"{'total':<10} {total:8.1f} ms"))
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:43
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hello', '0004_archivedbooking'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('method', models.CharField(max_length=10)),
+                ('path', models.CharField(max_length=500)),
+                ('status_code', models.PositiveSmallIntegerField()),
+                ('duration_ms', models.FloatField()),
+                ('sql_ms', models.FloatField()),
+                ('sql_count', models.PositiveIntegerField()),
+                ('filename', models.CharField(help_text="cProfile dump under PROFILER['DIR'].", max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'Request profiles',
+                'ordering': ['-duration_ms'],
+                'indexes': [models.Index(fields=['duration_ms'], name='hello_reque_duratio_d3cb6d_idx'), models.Index(fields=['created_at'], name='hello_reque_created_348759_idx')],
+            },
+        ),
+    ]
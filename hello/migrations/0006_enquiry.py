@@ -0,0 +1,43 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hello', '0005_requestprofile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Enquiry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ref', models.CharField(editable=False, max_length=32, unique=True)),
+                ('name', models.CharField(max_length=120)),
+                ('email', models.EmailField(max_length=254)),
+                ('phone', models.CharField(max_length=30)),
+                ('package', models.CharField(blank=True, help_text='Package the visitor enquired about, if any.', max_length=200)),
+                ('destination', models.CharField(blank=True, max_length=200)),
+                ('departure_city', models.CharField(blank=True, max_length=100)),
+                ('trip_type', models.CharField(blank=True, max_length=20)),
+                ('check_in', models.DateField()),
+                ('check_out', models.DateField()),
+                ('adults', models.PositiveSmallIntegerField(default=1)),
+                ('children', models.PositiveSmallIntegerField(default=0)),
+                ('infants', models.PositiveSmallIntegerField(default=0)),
+                ('rooms', models.PositiveSmallIntegerField(default=1)),
+                ('hotel_category', models.CharField(blank=True, max_length=30)),
+                ('budget', models.CharField(blank=True, max_length=50)),
+                ('visa', models.CharField(blank=True, max_length=30)),
+                ('message', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name_plural': 'Enquiries',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['created_at'], name='hello_enqui_created_975ec1_idx'), models.Index(fields=['email'], name='hello_enqui_email_67a6fb_idx')],
+            },
+        ),
+    ]
@@ -115,6 +115,45 @@ class Booking(models.Model):
         super().save(*args, **kwargs)
 
 
+class ArchivedBooking(models.Model):
+    """
+    A Booking moved out of the hot table by ``manage.py archive_bookings``.
+    Keeps the original booking id as its primary key so booking numbers stay stable.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="archived_bookings")
+    package = models.ForeignKey(Package, on_delete=models.PROTECT, related_name="archived_bookings")
+    booking_date = models.DateTimeField()
+    travel_date = models.DateField()
+    number_of_people = models.PositiveIntegerField()
+    total_price = models.DecimalField(max_digits=10, decimal_places=2)
+    status = models.CharField(max_length=10, choices=Booking.STATUS_CHOICES)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-travel_date']
+        verbose_name_plural = "Archived bookings"
+        indexes = [
+            models.Index(fields=['user', 'travel_date']),
+        ]
+
+    def __str__(self):
+        return f"Archived booking #{self.id} • {self.user.username} • {self.package.title}"
+
+    @classmethod
+    def from_booking(cls, booking):
+        return cls(
+            id=booking.id,
+            user_id=booking.user_id,
+            package_id=booking.package_id,
+            booking_date=booking.booking_date,
+            travel_date=booking.travel_date,
+            number_of_people=booking.number_of_people,
+            total_price=booking.total_price,
+            status=booking.status,
+        )
+
+
 class Review(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="reviews")
     package = models.ForeignKey(Package, on_delete=models.CASCADE, related_name="reviews")
@@ -133,3 +172,61 @@ class Review(models.Model):
 
     def __str__(self):
         return f"{self.package.title} • {self.rating}/5 by {self.user.username}"
+
+
+class Enquiry(models.Model):
+    """A lead from the enquiry form, written in batches by hello.enquiries.drain()."""
+    ref = models.CharField(max_length=32, unique=True, editable=False)
+    name = models.CharField(max_length=120)
+    email = models.EmailField()
+    phone = models.CharField(max_length=30)
+    package = models.CharField(max_length=200, blank=True, help_text="Package the visitor enquired about, if any.")
+    destination = models.CharField(max_length=200, blank=True)
+    departure_city = models.CharField(max_length=100, blank=True)
+    trip_type = models.CharField(max_length=20, blank=True)
+    check_in = models.DateField()
+    check_out = models.DateField()
+    adults = models.PositiveSmallIntegerField(default=1)
+    children = models.PositiveSmallIntegerField(default=0)
+    infants = models.PositiveSmallIntegerField(default=0)
+    rooms = models.PositiveSmallIntegerField(default=1)
+    hotel_category = models.CharField(max_length=30, blank=True)
+    budget = models.CharField(max_length=50, blank=True)
+    visa = models.CharField(max_length=30, blank=True)
+    message = models.TextField(blank=True)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name_plural = "Enquiries"
+        indexes = [
+            models.Index(fields=['created_at']),
+            models.Index(fields=['email']),
+        ]
+
+    def __str__(self):
+        return f"{self.name} • {self.package or 'General enquiry'}"
+
+
+class RequestProfile(models.Model):
+    """One request captured by hello.profiling.ProfilerMiddleware."""
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=500)
+    status_code = models.PositiveSmallIntegerField()
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    duration_ms = models.FloatField()
+    sql_ms = models.FloatField()
+    sql_count = models.PositiveIntegerField()
+    filename = models.CharField(max_length=100, help_text="cProfile dump under PROFILER['DIR'].")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-duration_ms']
+        verbose_name_plural = "Request profiles"
+        indexes = [
+            models.Index(fields=['duration_ms']),
+            models.Index(fields=['created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.method} {self.path} • {self.duration_ms:.0f} ms"
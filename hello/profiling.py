@@ -0,0 +1,141 @@
+"""
+Opt-in request profiler.
+
+With PROFILER["ENABLED"] off the middleware removes itself at startup
+(MiddlewareNotUsed), so there is no per-request cost. When on, a request is
+profiled if it falls in the random SAMPLE_RATE, or carries ``?profile=1`` and
+the signed staff cookie that is set when a staff user logs in (see
+hello/signals.py). Checking the cookie needs no session or database access,
+so other visitors cannot make pages slow with ``?profile=1``. The middleware
+sits first in MIDDLEWARE so the profile covers session and auth too. The
+cProfile dump (open with snakeviz, or flameprof for a flamegraph) is written
+under PROFILER["DIR"] and indexed by a RequestProfile row.
+"""
+import cProfile
+import logging
+import random
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+COOKIE_SALT = "hello.profiling"
+
+
+class _SQLTimer:
+    """connection.execute_wrapper hook that totals query time."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+
+
+class ProfilerMiddleware:
+    def __init__(self, get_response):
+        if not settings.PROFILER["ENABLED"]:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.dir = Path(settings.PROFILER["DIR"])
+
+    def _sampled(self):
+        rate = settings.PROFILER["SAMPLE_RATE"]
+        return rate > 0 and random.random() < rate
+
+    def _staff_id(self, request):
+        """User id from the signed staff cookie if ``?profile=1`` was asked for."""
+        cfg = settings.PROFILER
+        if not request.GET.get(cfg["STAFF_PARAM"]):
+            return None
+        return request.get_signed_cookie(
+            cfg["COOKIE"], default=None, salt=COOKIE_SALT, max_age=settings.SESSION_COOKIE_AGE
+        )
+
+    def __call__(self, request):
+        sampled = self._sampled()
+        staff_id = None if sampled else self._staff_id(request)
+        if sampled or staff_id:
+            response = self._profile(request, sampled, staff_id)
+        else:
+            response = self.get_response(request)
+        self._update_cookie(request, response)
+        return response
+
+    def _profile(self, request, sampled, staff_id):
+        timer = _SQLTimer()
+        profiler = cProfile.Profile()
+        wrappers = [conn.execute_wrapper(timer) for conn in connections.all()]
+        for wrapper in wrappers:
+            wrapper.__enter__()
+        started = time.perf_counter()
+        try:
+            profiler.enable()
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+            for wrapper in reversed(wrappers):
+                wrapper.__exit__(None, None, None)
+        duration = time.perf_counter() - started
+
+        # The cookie outlives a revoked staff flag; re-check the user it names.
+        user = getattr(request, "user", None)
+        if not sampled and not (user is not None and user.is_staff and str(user.pk) == staff_id):
+            return response
+        try:
+            self._save(request, response, profiler, duration, timer)
+        except Exception:
+            logger.exception("Could not store request profile for %s", request.path)
+        return response
+
+    def _update_cookie(self, request, response):
+        """Apply a login/logout recorded by hello.signals to the staff cookie."""
+        value = getattr(request, "profiler_cookie", None)
+        if value is None:
+            return
+        name = settings.PROFILER["COOKIE"]
+        if value:
+            response.set_signed_cookie(
+                name, value, salt=COOKIE_SALT, max_age=settings.SESSION_COOKIE_AGE,
+                secure=settings.SESSION_COOKIE_SECURE, httponly=True, samesite="Lax",
+            )
+        elif name in request.COOKIES:
+            response.delete_cookie(name, samesite="Lax")
+
+    def _save(self, request, response, profiler, duration, timer):
+        from .models import RequestProfile
+
+        self.dir.mkdir(parents=True, exist_ok=True)
+        filename = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}.prof"
+        profiler.dump_stats(self.dir / filename)
+
+        user = getattr(request, "user", None)
+        RequestProfile.objects.create(
+            method=request.method,
+            path=request.get_full_path()[:500],
+            status_code=response.status_code,
+            user=user if user is not None and user.is_authenticated else None,
+            duration_ms=duration * 1000,
+            sql_ms=timer.seconds * 1000,
+            sql_count=timer.count,
+            filename=filename,
+        )
+        self._prune(RequestProfile)
+
+    def _prune(self, RequestProfile):
+        keep = settings.PROFILER["KEEP"]
+        stale = RequestProfile.objects.order_by("-created_at")[keep:]
+        for profile in stale:
+            (self.dir / profile.filename).unlink(missing_ok=True)
+            profile.delete()
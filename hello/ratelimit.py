@@ -0,0 +1,120 @@
+"""
+Sliding-window rate limiting for expensive POST endpoints.
+
+Counters live in the shared cache so every gunicorn worker sees the same
+totals; if the cache backend errors, a per-process counter takes over so
+limiting degrades instead of failing open. Limits are configured per scope in
+settings.RATELIMITS, e.g. ``{"login": {"ip": "20/5m", "account": "5/5m"}}``.
+"""
+import hashlib
+import logging
+import re
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+_RATE_RE = re.compile(r"^(\d+)/(\d*)([smhd])$")
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+_local_counts = {}
+_local_lock = threading.Lock()
+
+
+def parse_rate(rate):
+    """'5/m' -> (5, 60); '20/5m' -> (20, 300)."""
+    match = _RATE_RE.match(rate.strip())
+    if not match:
+        raise ValueError(f"Invalid rate {rate!r}; expected e.g. '5/m' or '20/15m'.")
+    limit, multiplier, unit = match.groups()
+    return int(limit), int(multiplier or 1) * _UNITS[unit]
+
+
+def client_ip(request):
+    """REMOTE_ADDR, or the address our proxies appended to X-Forwarded-For."""
+    hops = settings.RATELIMIT_PROXY_COUNT
+    forwarded = request.META.get("HTTP_X_FORWARDED_FOR")
+    if hops and forwarded:
+        chain = [ip.strip() for ip in forwarded.split(",") if ip.strip()]
+        if len(chain) >= hops:
+            return chain[-hops]
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def _incr(key, period):
+    try:
+        cache.add(key, 0, timeout=period * 2)
+        return cache.incr(key)
+    except Exception as exc:
+        logger.warning("Rate limit cache unavailable, using local counters: %s", exc)
+    now = time.monotonic()
+    with _local_lock:
+        for stale in [k for k, (_, exp) in _local_counts.items() if exp < now]:
+            del _local_counts[stale]
+        count, expires = _local_counts.get(key, (0, now + period * 2))
+        _local_counts[key] = (count + 1, expires)
+        return count + 1
+
+
+def _get(key):
+    try:
+        return cache.get(key, 0)
+    except Exception:
+        with _local_lock:
+            return _local_counts.get(key, (0, 0))[0]
+
+
+def hit(scope, kind, ident, rate):
+    """
+    Record one request and return the seconds to wait if it is over ``rate``
+    (0 when allowed). Uses the two-window sliding approximation: the previous
+    window's count is weighted by how much of it still overlaps.
+    """
+    limit, period = parse_rate(rate)
+    now = time.time()
+    window = int(now // period)
+    digest = hashlib.sha1(ident.encode("utf-8")).hexdigest()[:16]
+    base = f"rl:{scope}:{kind}:{digest}"
+
+    current = _incr(f"{base}:{window}", period)
+    previous = _get(f"{base}:{window - 1}")
+    overlap = 1 - (now % period) / period
+    if previous * overlap + current <= limit:
+        return 0
+    return int(period - now % period) + 1
+
+
+def ratelimit(scope, account=None, methods=("POST",)):
+    """
+    Throttle a view by client IP and, if ``account`` is given, by the account
+    identifier it extracts from the request. Runs before the view body, so a
+    rejected request never reaches authentication or form processing.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            rates = settings.RATELIMITS.get(scope, {})
+            if settings.RATELIMIT_ENABLED and request.method in methods and rates:
+                idents = {"ip": client_ip(request)}
+                if account is not None:
+                    idents["account"] = (account(request) or "").strip().lower()
+                retry_after = max(
+                    (hit(scope, kind, idents[kind], rate)
+                     for kind, rate in rates.items() if idents.get(kind)),
+                    default=0,
+                )
+                if retry_after:
+                    response = HttpResponse(
+                        "Too many requests. Please try again later.",
+                        status=429, content_type="text/plain",
+                    )
+                    response["Retry-After"] = str(retry_after)
+                    return response
+            return view(request, *args, **kwargs)
+        return wrapped
+    return decorator
@@ -0,0 +1,27 @@
+from django.contrib.auth.signals import user_logged_in, user_logged_out
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import bump_version
+from .models import Destination, Package
+
+
+@receiver([post_save, post_delete], sender=Package)
+@receiver([post_save, post_delete], sender=Destination)
+def invalidate_package_cache(sender, **kwargs):
+    # After commit, so no worker can refill the new version with old rows.
+    transaction.on_commit(bump_version)
+
+
+@receiver(user_logged_in)
+def remember_staff_profiler(sender, request, user, **kwargs):
+    # ProfilerMiddleware turns this into its signed staff cookie ("" deletes it).
+    if request is not None:
+        request.profiler_cookie = str(user.pk) if user.is_staff else ""
+
+
+@receiver(user_logged_out)
+def forget_staff_profiler(sender, request, user, **kwargs):
+    if request is not None:
+        request.profiler_cookie = ""
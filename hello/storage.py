@@ -0,0 +1,27 @@
+from django.core.files.base import ContentFile
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+from .assets import build_bundles
+
+
+class BundledManifestStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """
+    Builds the CSS bundles from hello/assets.py before hashing, so each bundle
+    is emitted with a hashed name plus .gz and .br (when Brotli is installed)
+    siblings, exactly like any other collected file.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            paths = dict(paths)
+
+            def read(source):
+                with self.open(source) as fh:
+                    return fh.read().decode("utf-8")
+
+            for name, css in build_bundles(read).items():
+                if self.exists(name):
+                    self.delete(name)
+                self._save(name, ContentFile(css.encode("utf-8")))
+                paths[name] = (self, name)
+        yield from super().post_process(paths, dry_run=dry_run, **options)
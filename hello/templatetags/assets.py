@@ -0,0 +1,49 @@
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+
+from ..assets import COMMON_BUNDLE, CSS_BUNDLES, bundle_name, critical_name
+
+register = template.Library()
+
+# Collected critical CSS, read once per process (files are immutable).
+_critical_cache = {}
+
+
+def _read_critical(bundle):
+    if bundle not in _critical_cache:
+        name = staticfiles_storage.stored_name(critical_name(bundle))
+        with staticfiles_storage.open(name) as fh:
+            _critical_cache[bundle] = fh.read().decode("utf-8")
+    return _critical_cache[bundle]
+
+
+@register.simple_tag
+def css_bundle(bundle):
+    """
+    Emit the stylesheets for a page bundle.
+
+    In DEBUG the source files are linked individually (bundles only exist after
+    collectstatic). Otherwise the page's critical rules are inlined so the
+    header and hero paint without waiting on the network, and the shared
+    common bundle plus the page bundle load without blocking render from
+    their hashed, precompressed, long-cached URLs.
+    """
+    if settings.DEBUG:
+        return format_html_join(
+            "\n", '<link rel="stylesheet" href="{}">',
+            ((static(src),) for src in CSS_BUNDLES[bundle]),
+        )
+
+    urls = [static(bundle_name(COMMON_BUNDLE)), static(bundle_name(bundle))]
+    preload = format_html_join(
+        "\n", '<link rel="preload" as="style" href="{}" onload="this.onload=null;this.rel=\'stylesheet\'">',
+        ((url,) for url in urls),
+    )
+    fallback = format_html_join("", '<link rel="stylesheet" href="{}">', ((url,) for url in urls))
+    critical = _read_critical(bundle)
+    inline = mark_safe(f"<style>{critical}</style>\n") if critical else ""
+    return format_html("{}{}\n<noscript>{}</noscript>", inline, preload, fallback)
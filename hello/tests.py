@@ -1,2 +1,546 @@
-from django.test import TestCase
+import datetime
+import fcntl
+import shutil
+import tempfile
+import threading
+import time
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.staticfiles import finders
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from . import cache as package_cache
+from . import enquiries
+from .archive import archivable, archive_chunk
+from .assets import CSS_BUNDLES, build_bundles, build_css, common_rules, critical_name, is_critical, split_rules
+from .cache import LocalLRU
+from .lifecycle import TRANSITIONS, apply
+from .models import ArchivedBooking, Booking, Destination, Enquiry, Package, RequestProfile
+from .profiling import ProfilerMiddleware
+from .ratelimit import hit, parse_rate
+from .warmup import warm_up
+
+
+class LocalLRUTests(SimpleTestCase):
+    def test_entries_expire_after_ttl(self):
+        lru = LocalLRU(maxsize=10, ttl=30)
+        with mock.patch("hello.cache.time.monotonic", return_value=100.0):
+            lru.set("a", 1)
+        with mock.patch("hello.cache.time.monotonic", return_value=129.0):
+            self.assertEqual(lru.get("a"), 1)
+        with mock.patch("hello.cache.time.monotonic", return_value=131.0):
+            self.assertIsNone(lru.get("a"))
+
+    def test_evicts_least_recently_used(self):
+        lru = LocalLRU(maxsize=2, ttl=60)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        lru.get("a")  # "b" is now the oldest
+        lru.set("c", 3)
+        self.assertIsNone(lru.get("b"))
+        self.assertEqual(lru.get("a"), 1)
+        self.assertEqual(lru.get("c"), 3)
+
+
+@override_settings(PACKAGE_CACHE={**settings.PACKAGE_CACHE, "ENABLED": True})
+class PackageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        package_cache._local.clear()
+        package_cache._version.update(value=None, checked=0.0)
+        destination = Destination.objects.create(name="Goa", country="India", description="Beaches")
+        self.package = Package.objects.create(
+            title="Goa Getaway", destination=destination, category="beach",
+            description="Sun", price=Decimal("100.00"),
+        )
+
+    def test_save_bumps_version_on_commit(self):
+        self.assertEqual(package_cache.get_package(self.package.slug).price, Decimal("100.00"))
+        version = package_cache.current_version()
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.package.price = Decimal("150.00")
+            self.package.save()
+        # Not bumped until the transaction commits.
+        self.assertEqual(package_cache.current_version(), version)
+        self.assertEqual(package_cache.get_package(self.package.slug).price, Decimal("100.00"))
+
+        for callback in callbacks:
+            callback()
+        self.assertGreater(package_cache.current_version(), version)
+        self.assertEqual(package_cache.get_package(self.package.slug).price, Decimal("150.00"))
+
+    def test_unknown_slug_is_none(self):
+        self.assertIsNone(package_cache.get_package("nowhere"))
+
+    def test_fill_lock_excludes_threads_that_arrive_after_a_release(self):
+        inside, leave, late_entered = threading.Event(), threading.Event(), threading.Event()
+
+        def first_waiter():
+            with package_cache._fill_lock("k"):
+                inside.set()
+                leave.wait(5)
+
+        def late_arrival():
+            with package_cache._fill_lock("k"):
+                late_entered.set()
+
+        waiter = threading.Thread(target=first_waiter)
+        with package_cache._fill_lock("k"):
+            waiter.start()
+            while package_cache._fill_locks["k"][1] < 2:
+                time.sleep(0.001)
+        inside.wait(5)
+        late = threading.Thread(target=late_arrival)
+        late.start()
+        # The first waiter still holds the lock, so the late arrival must queue.
+        self.assertFalse(late_entered.wait(0.1))
+        leave.set()
+        waiter.join(5)
+        late.join(5)
+        self.assertTrue(late_entered.is_set())
+        self.assertEqual(package_cache._fill_locks, {})
+
+    def test_concurrent_misses_load_once(self):
+        loads = []
+
+        def slow_load(slug):
+            loads.append(slug)
+            time.sleep(0.1)
+            return self.package
+
+        with mock.patch("hello.cache._load", side_effect=slow_load):
+            threads = [threading.Thread(target=package_cache.get_package, args=(self.package.slug,)) for _ in range(6)]
+            for thread in threads:
+                thread.start()
+                time.sleep(0.02)
+            for thread in threads:
+                thread.join(5)
+        self.assertEqual(loads, [self.package.slug])
+        self.assertEqual(package_cache._fill_locks, {})
+
+
+class RateLimitTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate("5/m"), (5, 60))
+        self.assertEqual(parse_rate("20/5m"), (20, 300))
+        self.assertEqual(parse_rate("1/d"), (1, 86400))
+        for bad in ("5", "x/m", "5/w", "/m"):
+            with self.assertRaises(ValueError):
+                parse_rate(bad)
+
+    def _hit(self, at, rate="2/m"):
+        with mock.patch("hello.ratelimit.time.time", return_value=at):
+            return hit("test", "ip", "10.0.0.1", rate)
+
+    def test_blocks_over_limit_until_window_ends(self):
+        self.assertEqual(self._hit(600.0), 0)
+        self.assertEqual(self._hit(610.0), 0)
+        self.assertEqual(self._hit(620.0), 41)
+
+    def test_previous_window_is_weighted_by_overlap(self):
+        for at in (600.0, 610.0, 620.0):
+            self._hit(at)
+        # Halfway into the next window, 3 * 0.5 + 1 > 2.
+        self.assertEqual(self._hit(690.0), 31)
+        # Two windows on, the old hits no longer count.
+        self.assertEqual(self._hit(780.0), 0)
+
+
+class BuildCSSTests(SimpleTestCase):
+    def test_split_rules_keeps_media_blocks_whole(self):
+        css = "/* c */ a { color: red; }\n@media (max-width: 600px) { a { color: blue } }"
+        self.assertEqual(split_rules(css), ["a{color: red}", "@media (max-width: 600px){a{color: blue}}"])
+
+    def test_dedupe_keeps_last_copy(self):
+        # Keeping the last "a" preserves its win over the "b, a" rule in between.
+        css = build_css(["a{color:red}\nb,a{color:blue}", "a{color:red}"])
+        self.assertEqual(css, "b,a{color:blue}\na{color:red}\n")
+
+    def test_common_rules_skip_rules_a_page_overrides_earlier(self):
+        pages = {
+            "one": split_rules(".x{color:red}\n.y{margin:0}"),
+            "two": split_rules(".x{color:blue}\n.x{color:red}\n.y{margin:0}"),
+        }
+        # Hoisting ".x{color:red}" ahead of page two's ".x{color:blue}" would flip it.
+        self.assertEqual(common_rules(pages), [".y{margin:0}"])
+
+    def test_critical_css_keeps_custom_properties(self):
+        self.assertTrue(is_critical(":root{--ink:#000}"))
+        self.assertTrue(is_critical("html,body{margin:0}"))
+        self.assertFalse(is_critical("a:hover{color:red}"))
+
+        def read(path):
+            return Path(finders.find(path)).read_text(encoding="utf-8")
+
+        bundles = build_bundles(read)
+        for bundle in CSS_BUNDLES:
+            critical = split_rules(bundles[critical_name(bundle)])
+            self.assertTrue(any(rule.startswith(":root{") for rule in critical), bundle)
+
+
+class SpoolMixin:
+    # Long enough that no timer fires unless a test asks for it.
+    flush_interval = 60
+
+    def setUp(self):
+        cache.clear()
+        self.spool = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.spool, ignore_errors=True)
+        self.use_spool()
+        self.addCleanup(self.cancel_flush)
+
+    def use_spool(self, **options):
+        cfg = {**settings.ENQUIRY, "SPOOL_DIR": self.spool, "FLUSH_INTERVAL": self.flush_interval, **options}
+        override = override_settings(ENQUIRY=cfg)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def cancel_flush(self):
+        with enquiries._flush_lock:
+            timer, enquiries._flush["timer"] = enquiries._flush["timer"], None
+        if timer is not None:
+            timer.cancel()
+
+    def _data(self, **overrides):
+        data = {
+            "name": "Asha", "email": "asha@example.com", "phone": "+91 98765 43210",
+            "package": "Goa Getaway", "check_in": datetime.date(2030, 1, 1),
+            "check_out": datetime.date(2030, 1, 5), "adults": 2, "children": 0,
+            "infants": 0, "rooms": 1, "message": "",
+        }
+        data.update(overrides)
+        return data
+
+
+class EnquirySpoolTests(SpoolMixin, TestCase):
+    def test_claim_dedupes_same_contact_and_package(self):
+        self.assertTrue(enquiries.claim("asha@example.com", "+91 98765 43210", "Goa"))
+        self.assertFalse(enquiries.claim(" ASHA@example.com", "9876543210", "goa"))
+        self.assertTrue(enquiries.claim("asha@example.com", "9876543210", "Kerala"))
+        enquiries.release("asha@example.com", "9876543210", "Goa")
+        self.assertTrue(enquiries.claim("asha@example.com", "9876543210", "Goa"))
+
+    def test_append_drain_round_trip(self):
+        enquiries.append(self._data())
+        enquiries.append(self._data(name="Ravi", email="ravi@example.com"))
+
+        self.assertEqual(enquiries.drain(), (2, 1))
+        self.assertEqual(sorted(Enquiry.objects.values_list("name", flat=True)), ["Asha", "Ravi"])
+        self.assertEqual(Enquiry.objects.get(name="Asha").check_out, datetime.date(2030, 1, 5))
+        self.assertEqual(list(self.spool.glob("*.jsonl")) + list(self.spool.glob("*.draining")), [])
+        self.assertEqual(enquiries.drain(), (0, 0))
+
+    def test_redraining_a_file_does_not_duplicate(self):
+        enquiries.append(self._data())
+        live = next(self.spool.glob("*.jsonl"))
+        copy = self.spool / "crashed.jsonl.1.draining"
+        shutil.copy(live, copy)
+
+        enquiries.drain()
+        self.assertEqual(Enquiry.objects.count(), 1)
+
+    def test_drain_skips_while_another_drain_holds_the_lock(self):
+        enquiries.append(self._data())
+        with open(self.spool / enquiries.DRAIN_LOCK, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self.assertEqual(enquiries.drain(), (0, 0))
+        self.assertEqual(enquiries.drain(), (1, 1))
+
+    def test_view_releases_claim_when_append_fails(self):
+        post = {
+            "name": "Asha", "email": "asha@example.com", "phone": "9876543210",
+            "check_in": "2030-01-01", "check_out": "2030-01-05",
+            "adults": 2, "children": 0, "infants": 0, "rooms": 1,
+        }
+        self.client.raise_request_exception = False
+        with mock.patch("hello.views.append", side_effect=OSError("disk full")), \
+                self.assertLogs("django.request", "ERROR"):
+            self.assertEqual(self.client.post("/enquiry/", post).status_code, 500)
+        self.assertEqual(self.client.post("/enquiry/", post).status_code, 200)
+        self.assertEqual(enquiries.drain()[0], 1)
+
+    def test_view_flushes_spool_in_process(self):
+        self.use_spool(FLUSH_INTERVAL=0)
+        post = {
+            "name": "Asha", "email": "asha@example.com", "phone": "9876543210",
+            "check_in": "2030-01-01", "check_out": "2030-01-05",
+            "adults": 2, "children": 0, "infants": 0, "rooms": 1,
+        }
+        self.assertEqual(self.client.post("/enquiry/", post).status_code, 200)
+        self.assertEqual(Enquiry.objects.get().email, "asha@example.com")
+        self.assertEqual(list(self.spool.glob("*.jsonl")), [])
+
+
+class EnquiryFlushTests(SpoolMixin, TransactionTestCase):
+    flush_interval = 0.05
+
+    def _wait_for_enquiries(self, count, timeout=5):
+        deadline = time.monotonic() + timeout
+        while Enquiry.objects.count() < count and time.monotonic() < deadline:
+            time.sleep(0.02)
+        return Enquiry.objects.count()
+
+    def test_timer_flushes_spooled_enquiry(self):
+        enquiries.append(self._data())
+        self.assertEqual(Enquiry.objects.count(), 0)
+        self.assertEqual(self._wait_for_enquiries(1), 1)
+        self.assertEqual(list(self.spool.glob("*.jsonl")), [])
+
+    def test_full_spool_file_flushes_at_once(self):
+        self.use_spool(FLUSH_INTERVAL=60, FLUSH_BYTES=1)
+        enquiries.append(self._data())
+        self.assertEqual(self._wait_for_enquiries(1, timeout=2), 1)
+
+
+# Rendered pages link static files, which only have hashed names and bundles
+# after collectstatic; in DEBUG they link the source files instead.
+serve_sources = override_settings(DEBUG=True)
+
+
+@serve_sources
+class EnquiryAdminTests(TestCase):
+    def test_enquiries_cannot_be_added_by_hand(self):
+        admin_user = User.objects.create_superuser("admin", "admin@example.com", "pw")
+        self.client.force_login(admin_user)
+        self.assertEqual(self.client.get("/admin/hello/enquiry/add/").status_code, 403)
+        self.assertEqual(self.client.get("/admin/hello/enquiry/").status_code, 200)
+
+
+@serve_sources
+class ProfilerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir, ignore_errors=True)
+        override = override_settings(PROFILER={**settings.PROFILER, "ENABLED": True, "DIR": self.dir, "KEEP": 2})
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def _login(self, **flags):
+        User.objects.create_user("sam", "sam@example.com", "pw", **flags)
+        return self.client.post("/login/", {"username": "sam", "password": "pw"})
+
+    def test_disabled_middleware_removes_itself(self):
+        with override_settings(PROFILER={**settings.PROFILER, "ENABLED": False}):
+            with self.assertRaises(MiddlewareNotUsed):
+                ProfilerMiddleware(lambda request: None)
+
+    def test_staff_login_enables_profile_param(self):
+        response = self._login(is_staff=True)
+        self.assertIn(settings.PROFILER["COOKIE"], response.cookies)
+        self.client.get("/about/?profile=1")
+        profile = RequestProfile.objects.get()
+        self.assertEqual(profile.user.username, "sam")
+        self.assertGreater(profile.sql_count, 0)  # session and user lookups are included
+        self.assertTrue((Path(self.dir) / profile.filename).exists())
+
+    def test_profile_param_is_ignored_without_staff_cookie(self):
+        response = self._login()
+        self.assertNotIn(settings.PROFILER["COOKIE"], response.cookies)
+        self.client.cookies[settings.PROFILER["COOKIE"]] = "1"  # unsigned
+        with mock.patch("hello.profiling.cProfile.Profile") as profile:
+            self.client.get("/about/?profile=1")
+        profile.assert_not_called()
+        self.assertFalse(RequestProfile.objects.exists())
+
+    def test_logout_clears_staff_cookie(self):
+        self._login(is_staff=True)
+        response = self.client.get("/logout/")
+        self.assertEqual(response.cookies[settings.PROFILER["COOKIE"]].value, "")
+
+    def test_sampled_profiles_are_pruned_to_keep(self):
+        with override_settings(PROFILER={**settings.PROFILER, "SAMPLE_RATE": 1}):
+            for _ in range(3):
+                self.client.get("/about/")
+        self.assertEqual(RequestProfile.objects.count(), 2)
+        kept = set(RequestProfile.objects.values_list("filename", flat=True))
+        self.assertEqual({p.name for p in Path(self.dir).iterdir()}, kept)
+
+
+class BookingFixtures:
+    def setUp(self):
+        self.user = User.objects.create_user("mira", "mira@example.com", "pw")
+        destination = Destination.objects.create(name="Leh", country="India", description="Hills")
+        self.package = Package.objects.create(
+            title="Ladakh Loop", destination=destination, category="adventure",
+            description="Passes", price=Decimal("200.00"),
+        )
+
+    def book(self, status, travel_in_days, people=1):
+        return Booking.objects.create(
+            user=self.user, package=self.package, status=status, number_of_people=people,
+            travel_date=timezone.localdate() + datetime.timedelta(days=travel_in_days),
+        )
+
+
+class ArchiveTests(BookingFixtures, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.old = [
+            self.book("COMPLETED", -800),
+            self.book("CANCELLED", -700),
+            self.book("COMPLETED", -600, people=2),
+        ]
+        self.recent = self.book("COMPLETED", -30)
+        self.pending = self.book("PENDING", -800)
+
+    def test_chunks_move_bookings_with_their_ids(self):
+        self.assertEqual(archive_chunk(archivable(), 2), 2)
+        self.assertEqual(archive_chunk(archivable(), 2), 1)
+        self.assertEqual(archive_chunk(archivable(), 2), 0)
+
+        self.assertEqual(set(ArchivedBooking.objects.values_list("id", flat=True)), {b.pk for b in self.old})
+        self.assertEqual(set(Booking.objects.values_list("id", flat=True)), {self.recent.pk, self.pending.pk})
+        archived = ArchivedBooking.objects.get(pk=self.old[2].pk)
+        self.assertEqual((archived.total_price, archived.status), (Decimal("400.00"), "COMPLETED"))
+
+    def test_rerun_after_partial_run_moves_nothing_twice(self):
+        call_command("archive_bookings", batch_size=1, max_batches=1, stdout=StringIO())
+        self.assertEqual(ArchivedBooking.objects.count(), 1)
+
+        call_command("archive_bookings", batch_size=1, stdout=StringIO())
+        call_command("archive_bookings", stdout=StringIO())
+        self.assertEqual(ArchivedBooking.objects.count(), 3)
+        self.assertEqual(Booking.objects.count(), 2)
+
+    def test_conflicting_archive_row_rolls_back_chunk(self):
+        ArchivedBooking.from_booking(self.old[1]).save()
+        with self.assertRaises(IntegrityError):
+            archive_chunk(archivable(), 10)
+        self.assertEqual(Booking.objects.count(), 5)
+        self.assertEqual(ArchivedBooking.objects.count(), 1)
+
+
+@serve_sources
+class DashboardArchiveTests(BookingFixtures, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.archived = self.book("COMPLETED", -800, people=3)
+        archive_chunk(archivable(), 10)
+        self.upcoming = self.book("CONFIRMED", 10)
+        self.client.force_login(self.user)
+
+    def test_totals_include_archived_bookings(self):
+        response = self.client.get("/dashboard/")
+        stats = response.context["stats"]
+        self.assertEqual(stats["total_bookings"], 2)
+        self.assertEqual(stats["archived_count"], 1)
+        self.assertEqual(stats["total_spent"], Decimal("800.00"))
+        self.assertNotIn("archived_bookings", response.context)
+
+    def test_history_param_lists_archived_bookings(self):
+        response = self.client.get("/dashboard/?history=archived")
+        self.assertEqual([b.pk for b in response.context["archived_bookings"]], [self.archived.pk])
+
+
+class LifecycleTests(BookingFixtures, TestCase):
+    transitions = {t.name: t for t in TRANSITIONS}
+
+    def _age(self, booking, hours):
+        Booking.objects.filter(pk=booking.pk).update(
+            booking_date=timezone.now() - datetime.timedelta(hours=hours)
+        )
+
+    def _status(self, booking):
+        return Booking.objects.values_list("status", flat=True).get(pk=booking.pk)
+
+    def test_expire_pending_covers_stale_and_past_bookings(self):
+        stale = self.book("PENDING", 30)
+        self._age(stale, settings.BOOKING_LIFECYCLE["PENDING_TTL_HOURS"] + 1)
+        past = self.book("PENDING", -1)
+        fresh = self.book("PENDING", 30)
+        confirmed = self.book("CONFIRMED", 30)
+        self._age(confirmed, 1000)
+
+        updated, _ = apply(self.transitions["expire_pending"], batch_size=1)
+        self.assertEqual(updated, 2)
+        self.assertEqual(self._status(stale), "CANCELLED")
+        self.assertEqual(self._status(past), "CANCELLED")
+        self.assertEqual(self._status(fresh), "PENDING")
+        self.assertEqual(self._status(confirmed), "CONFIRMED")
+
+    def test_complete_trips_only_touches_past_confirmed(self):
+        done = self.book("CONFIRMED", -1)
+        upcoming = self.book("CONFIRMED", 0)
+        pending = self.book("PENDING", -1)
+        cancelled = self.book("CANCELLED", -1)
+
+        updated, _ = apply(self.transitions["complete_trips"], batch_size=10)
+        self.assertEqual(updated, 1)
+        self.assertEqual(
+            [self._status(b) for b in (done, upcoming, pending, cancelled)],
+            ["COMPLETED", "CONFIRMED", "PENDING", "CANCELLED"],
+        )
+
+    def test_second_run_updates_nothing(self):
+        self.book("CONFIRMED", -5)
+        self.book("PENDING", -5)
+        for transition in TRANSITIONS:
+            apply(transition, batch_size=10)
+        self.assertEqual([apply(t, batch_size=10)[0] for t in TRANSITIONS], [0, 0])
+
+
+@serve_sources
+class BookingAdminActionTests(BookingFixtures, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(User.objects.create_superuser("boss", "boss@example.com", "pw"))
+
+    def _act(self, action, bookings):
+        response = self.client.post(
+            "/admin/hello/booking/",
+            {"action": action, "_selected_action": [b.pk for b in bookings]},
+            follow=True,
+        )
+        return [str(m) for m in response.context["messages"]]
+
+    def test_actions_skip_invalid_source_statuses(self):
+        confirmed = self.book("CONFIRMED", -1)
+        pending = self.book("PENDING", 5)
+        cancelled = self.book("CANCELLED", 5)
+
+        messages = self._act("mark_completed", [confirmed, pending, cancelled])
+        self.assertEqual(messages, [
+            "1 booking(s) marked completed.",
+            "2 booking(s) skipped: only confirmed bookings can be marked completed.",
+        ])
+        statuses = dict(Booking.objects.values_list("pk", "status"))
+        self.assertEqual(
+            [statuses[b.pk] for b in (confirmed, pending, cancelled)], ["COMPLETED", "PENDING", "CANCELLED"]
+        )
+
+    def test_cancel_accepts_pending_and_confirmed(self):
+        bookings = [self.book("PENDING", 5), self.book("CONFIRMED", 5), self.book("COMPLETED", -5)]
+        messages = self._act("mark_cancelled", bookings)
+        self.assertEqual(messages[0], "2 booking(s) marked cancelled.")
+        self.assertIn("1 booking(s) skipped", messages[1])
+
+
+class WarmUpTests(TestCase):
+    def test_catalog_step_reports_skip_when_cache_disabled(self):
+        with override_settings(PACKAGE_CACHE={**settings.PACKAGE_CACHE, "ENABLED": False}):
+            (name, _, detail), = warm_up(["catalog"])
+        self.assertEqual((name, detail), ("catalog", "skipped (package cache disabled)"))
+
+    @override_settings(PACKAGE_CACHE={**settings.PACKAGE_CACHE, "ENABLED": True})
+    def test_catalog_step_counts_primed_packages(self):
+        cache.clear()
+        destination = Destination.objects.create(name="Goa", country="India", description="Beaches")
+        Package.objects.create(title="Goa Getaway", destination=destination, category="beach",
+                               description="Sun", price=Decimal("100.00"))
+        (_, _, detail), = warm_up(["catalog"])
+        self.assertEqual(detail, "1 packages")
@@ -4,12 +4,16 @@ from django import forms
 from django.contrib import messages
 from django.contrib.auth import authenticate, login, logout, get_user_model
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q, Sum
+from django.db.models import Count, Q, Sum
+from django.http import Http404, JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse
 from django.utils import timezone
 
-from .models import Booking, Package, Review
+from .cache import get_package
+from .enquiries import append, claim, release
+from .models import ArchivedBooking, Booking, Package, Review
+from .ratelimit import ratelimit
 
 
 # ---------- Static pages ----------
@@ -34,7 +38,26 @@ def terms(request):
 def cookies(request):
     return render(request, "hello/cookies.html")
 
+
+@ratelimit("enquiry")
 def enquiry(request):
+    """
+    GET renders the form; POST validates and spools the lead for
+    ``manage.py drain_enquiries`` instead of writing to the database.
+    """
+    if request.method == "POST":
+        form = EnquiryForm(request.POST)
+        if not form.is_valid():
+            return JsonResponse({"ok": False, "errors": form.errors}, status=400)
+        data = form.cleaned_data
+        triple = data["email"], data["phone"], data["package"]
+        if claim(*triple):
+            try:
+                append(data)
+            except Exception:
+                release(*triple)  # let the client's retry through
+                raise
+        return JsonResponse({"ok": True})
     return render(request, "hello/enquiry.html")
 
 
@@ -51,10 +74,9 @@ def packages(request):
 
 def package_detail(request, slug):
     """Show details for one package."""
-    package = get_object_or_404(
-        Package.objects.select_related("destination"),
-        slug=slug
-    )
+    package = get_package(slug)
+    if package is None:
+        raise Http404("No Package matches the given query.")
     reviews = Review.objects.filter(package=package).select_related("user")
     return render(request, "hello/package_detail.html", {"package": package, "reviews": reviews})
 
@@ -64,12 +86,15 @@ def package_detail(request, slug):
 def dashboard(request):
     today = timezone.localdate()
     bookings = Booking.objects.filter(user=request.user).select_related("package")
+    archived = ArchivedBooking.objects.filter(user=request.user)
+    archived_totals = archived.aggregate(n=Count("id"), s=Sum("total_price"))
 
     stats = {
-        "total_bookings": bookings.count(),
+        "total_bookings": bookings.count() + archived_totals["n"],
         "upcoming_count": bookings.filter(travel_date__gte=today).count(),
-        "total_spent": bookings.aggregate(s=Sum("total_price"))["s"] or 0,
+        "total_spent": (bookings.aggregate(s=Sum("total_price"))["s"] or 0) + (archived_totals["s"] or 0),
         "confirmed_count": bookings.filter(status="CONFIRMED").count(),
+        "archived_count": archived_totals["n"],
     }
 
     ctx = {
@@ -82,11 +107,20 @@ def dashboard(request):
             .select_related("destination")[:3]
         ),
         "upcoming_booking": bookings.filter(travel_date__gte=today).order_by("travel_date").first(),
+        # Archived history is only read when asked for (?history=archived).
+        "show_archived": request.GET.get("history") == "archived",
     }
+    if ctx["show_archived"]:
+        ctx["archived_bookings"] = archived.select_related("package")
     return render(request, "hello/dashboard.html", ctx)
 
 
 # ---------- Auth ----------
+def _login_identifier(request):
+    return request.POST.get("email") or request.POST.get("username")
+
+
+@ratelimit("login", account=_login_identifier)
 def login_view(request):
     if request.method == "POST":
         identifier = (request.POST.get("email") or request.POST.get("username") or "").strip()
@@ -119,6 +153,7 @@ def logout_view(request):
     return redirect("home")
 
 
+@ratelimit("signup")
 def signup_view(request):
     User = get_user_model()
     if request.method == "POST":
@@ -165,25 +200,59 @@ class BookingForm(forms.ModelForm):
         return n
 
 
+class EnquiryForm(forms.Form):
+    name = forms.CharField(max_length=120)
+    email = forms.EmailField()
+    phone = forms.CharField(max_length=30)
+    package = forms.CharField(max_length=200, required=False)
+    destination = forms.CharField(max_length=200, required=False)
+    departure_city = forms.CharField(max_length=100, required=False)
+    trip_type = forms.CharField(max_length=20, required=False)
+    check_in = forms.DateField()
+    check_out = forms.DateField()
+    adults = forms.IntegerField(min_value=1, max_value=20)
+    children = forms.IntegerField(min_value=0, max_value=20)
+    infants = forms.IntegerField(min_value=0, max_value=20)
+    rooms = forms.IntegerField(min_value=1, max_value=20)
+    hotel_category = forms.CharField(max_length=30, required=False)
+    budget = forms.CharField(max_length=50, required=False)
+    visa = forms.CharField(max_length=30, required=False)
+    message = forms.CharField(max_length=5000, required=False)
+
+    def clean(self):
+        cleaned = super().clean()
+        check_in, check_out = cleaned.get("check_in"), cleaned.get("check_out")
+        if check_in and check_out and check_out < check_in:
+            self.add_error("check_out", "Check-out must be after check-in.")
+        return cleaned
+
+
 @login_required(login_url="/login/")
+@ratelimit("book", account=lambda request: str(request.user.pk))
 def book_package(request, slug):
     """
     Create a booking for the given package.
     If user was redirected here by login_required, login_view will send them back via ?next.
     """
-    package = get_object_or_404(
-        Package.objects.select_related("destination"),
-        slug=slug,
-        is_available=True
-    )
+    package = get_package(slug)
+    if package is None or not package.is_available:
+        raise Http404("No Package matches the given query.")
 
     if request.method == "POST":
         form = BookingForm(request.POST)
         if form.is_valid():
+            # Price and availability from the database, never from the
+            # (possibly stale) cached package.
+            price = (
+                Package.objects.filter(pk=package.pk, is_available=True)
+                .values_list("price", flat=True).first()
+            )
+            if price is None:
+                raise Http404("No Package matches the given query.")
             booking = form.save(commit=False)
             booking.user = request.user
             booking.package = package
-            booking.total_price = (package.price or Decimal("0")) * Decimal(form.cleaned_data["number_of_people"])
+            booking.total_price = price * Decimal(form.cleaned_data["number_of_people"])
             booking.save()
             messages.success(request, f"Booking created successfully! #{booking.id}")
             return redirect(reverse("booking_thanks", kwargs={"booking_id": booking.id}))
@@ -0,0 +1,88 @@
+"""
+Warm-up steps run before a worker accepts traffic.
+
+Process-wide steps (templates, URL resolver) are safe to run in the gunicorn
+master with ``preload_app`` so forked workers share them copy-on-write.
+Per-worker steps (database, catalog) open sockets and must run after fork.
+"""
+import logging
+import time
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.template.loader import get_template
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+
+def warm_templates():
+    """Compile every template under hello/templates/hello into the cached loader."""
+    root = Path(apps.get_app_config("hello").path) / "templates"
+    names = sorted(p.relative_to(root).as_posix() for p in (root / "hello").rglob("*.html"))
+    for name in names:
+        get_template(name)
+    return f"{len(names)} templates"
+
+
+def warm_urls():
+    """Populate the root resolver's reverse/namespace tables."""
+    resolver = get_resolver()
+    resolver.reverse_dict  # noqa: B018 - property access triggers _populate()
+    return f"{len(resolver.url_patterns)} patterns"
+
+
+def warm_database():
+    """Open a persistent connection per alias (kept for CONN_MAX_AGE)."""
+    for conn in connections.all():
+        conn.ensure_connection()
+    return ", ".join(connections)
+
+
+def warm_catalog():
+    """Run the packages listing query once and seed the package cache with it."""
+    from .cache import prime
+    from .models import Package
+
+    if not settings.PACKAGE_CACHE["ENABLED"]:
+        return "skipped (package cache disabled)"
+    count = prime(Package.objects.filter(is_available=True).select_related("destination"))
+    return f"{count} packages"
+
+
+STEPS = {
+    "templates": warm_templates,
+    "urls": warm_urls,
+    "database": warm_database,
+    "catalog": warm_catalog,
+}
+SHARED_STEPS = ("templates", "urls")
+WORKER_STEPS = ("database", "catalog")
+
+
+def warm_up(steps=None):
+    """
+    Run the named warm-up steps (all by default) and log a timing report.
+    A failing step is logged and skipped; warm-up never blocks startup.
+    Returns a list of (step, milliseconds, detail) tuples.
+    """
+    report = []
+    started = time.perf_counter()
+    for name in steps or STEPS:
+        t0 = time.perf_counter()
+        try:
+            detail = STEPS[name]()
+        except Exception as exc:
+            logger.warning("Warm-up step %r failed: %s", name, exc)
+            detail = f"failed: {exc}"
+        report.append((name, (time.perf_counter() - t0) * 1000, detail))
+
+    total = (time.perf_counter() - started) * 1000
+    logger.info(
+        "Warm-up finished in %.1f ms (%s)",
+        total,
+        ", ".join(f"{name} {ms:.1f} ms" for name, ms, _ in report),
+    )
+    return report
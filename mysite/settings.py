@@ -47,6 +47,8 @@ INSTALLED_APPS = [
 
 # --- Middleware ---
 MIDDLEWARE = [
+    # First, so profiles include the session/auth/CSRF middleware and their SQL.
+    "hello.profiling.ProfilerMiddleware",  # no-op unless PROFILER["ENABLED"]
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",  # static files
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -87,6 +89,76 @@ DATABASES = {
     )
 }
 
+# --- Cache ---
+# Shared across gunicorn workers when REDIS_URL is set (needs the `redis` package);
+# otherwise per-process memory, which is fine for local development.
+REDIS_URL = os.environ.get("REDIS_URL")
+if REDIS_URL:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": REDIS_URL}}
+else:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+# Package-by-slug read-through cache (hello/cache.py). Times are in seconds.
+# Only safe with a cache shared by all workers; check hello.E001 enforces it.
+PACKAGE_CACHE = {
+    "ENABLED": bool(REDIS_URL),
+    "LOCAL_MAXSIZE": 256,      # in-process LRU entries per worker
+    "LOCAL_TTL": 30,
+    "SHARED_TTL": 600,
+    "NEGATIVE_TTL": 30,        # unknown slugs
+    "VERSION_CHECK": 1,        # how often a worker re-reads the version stamp
+    "FILL_LOCK_TIMEOUT": 5,
+    "FILL_WAIT": 0.5,          # how long other workers wait on a fill before querying
+    "STATS_FLUSH_EVERY": 100,  # lookups between pushes of hit counters to the shared cache
+}
+
+# --- Rate limiting (hello/ratelimit.py) ---
+# Rates are "<count>/<period>", e.g. "5/m" or "20/15m"; only POSTs are counted.
+RATELIMIT_ENABLED = os.environ.get("RATELIMIT_ENABLED", "") != "False"
+# Proxies that append to X-Forwarded-For in front of the app (Render adds one).
+RATELIMIT_PROXY_COUNT = int(os.environ.get("RATELIMIT_PROXY_COUNT", "1" if RENDER_HOST else "0"))
+RATELIMITS = {
+    "login": {"ip": "20/5m", "account": "5/5m"},
+    "signup": {"ip": "5/h"},
+    "book": {"ip": "30/h", "account": "10/h"},
+    "enquiry": {"ip": "30/h"},
+}
+
+# --- Booking archival (manage.py archive_bookings) ---
+BOOKING_ARCHIVE = {
+    "RETENTION_DAYS": 365,  # by travel date
+    "STATUSES": ["COMPLETED", "CANCELLED"],
+    "BATCH_SIZE": 500,
+}
+
+# --- Booking lifecycle (manage.py sweep_bookings) ---
+BOOKING_LIFECYCLE = {
+    "PENDING_TTL_HOURS": 48,  # unconfirmed bookings older than this are cancelled
+    "BATCH_SIZE": 1000,
+}
+
+# --- Request profiler (hello/profiling.py; results in admin › Request profiles) ---
+PROFILER = {
+    "ENABLED": os.environ.get("DJANGO_PROFILER", "") == "True",
+    "SAMPLE_RATE": float(os.environ.get("DJANGO_PROFILER_SAMPLE_RATE", "0")),  # 0.01 = 1% of requests
+    "STAFF_PARAM": "profile",  # staff add ?profile=1 to profile a page
+    "COOKIE": "staff_profiler",  # signed at staff login; ?profile=1 is ignored without it
+    "DIR": BASE_DIR / "profiles",
+    "KEEP": 200,
+}
+
+# --- Enquiry ingestion (hello/enquiries.py; flushed by the web process that spooled it) ---
+ENQUIRY = {
+    "SPOOL_DIR": Path(os.environ.get("ENQUIRY_SPOOL_DIR", BASE_DIR / "spool" / "enquiries")),
+    "BATCH_SIZE": 500,
+    "FLUSH_INTERVAL": 2,        # seconds from the first unflushed enquiry to a flush (0 = inline)
+    "FLUSH_BYTES": 256 * 1024,  # flush at once when this process's spool file reaches this size
+    "DEDUPE_WINDOW": 10 * 60,  # seconds; same email + phone + package is accepted once
+}
+
+# --- Worker warm-up (see hello/warmup.py, gunicorn.conf.py) ---
+WARMUP_ON_STARTUP = os.environ.get("DJANGO_WARMUP", "") != "False"
+
 # --- Password validation ---
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
@@ -105,7 +177,11 @@ USE_TZ = True
 STATIC_URL = "/static/"
 STATICFILES_DIRS = [BASE_DIR / "static"]
 STATIC_ROOT = BASE_DIR / "staticfiles"
-STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+# Builds per-page CSS bundles, then hashes and gzip/brotli-compresses everything.
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "hello.storage.BundledManifestStaticFilesStorage"},
+}
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
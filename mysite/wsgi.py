@@ -7,10 +7,25 @@ For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 """
 
+import logging
 import os
+import time
 
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mysite.settings')
 
+_started = time.perf_counter()
 application = get_wsgi_application()
+logging.getLogger(__name__).info(
+    "Django application loaded in %.1f ms", (time.perf_counter() - _started) * 1000
+)
+
+# Process-wide warm-up; runs once in the gunicorn master under preload_app.
+# Per-worker steps (DB connections, catalog) run from gunicorn.conf.py.
+from django.conf import settings  # noqa: E402
+
+if settings.WARMUP_ON_STARTUP:
+    from hello.warmup import SHARED_STEPS, warm_up  # noqa: E402
+
+    warm_up(SHARED_STEPS)